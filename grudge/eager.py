@@ -41,6 +41,19 @@ __doc__ = """
 """
 
 
+def _apply_to_dof_arrays(f, vec):
+    """Apply *f* to *vec* if it is a :class:`~meshmode.dof_array.DOFArray`,
+    or else to each :class:`~meshmode.dof_array.DOFArray` in the (possibly
+    nested) object array *vec*.
+    """
+    if (isinstance(vec, np.ndarray)
+            and vec.dtype.char == "O"
+            and not isinstance(vec, DOFArray)):
+        return obj_array_vectorize(lambda el: _apply_to_dof_arrays(f, el), vec)
+
+    return f(vec)
+
+
 class EagerDGDiscretization(DGDiscretizationWithBoundaries):
     """
     Inherits from :class:`~grudge.discretization.DGDiscretizationWithBoundaries`.
@@ -83,13 +96,8 @@ class EagerDGDiscretization(DGDiscretizationWithBoundaries):
         :arg tgt: a :class:`~grudge.sym.DOFDesc`, or a value convertible to one
         :arg vec: a :class:`~meshmode.dof_array.DOFArray`
         """
-        if (isinstance(vec, np.ndarray)
-                and vec.dtype.char == "O"
-                and not isinstance(vec, DOFArray)):
-            return obj_array_vectorize(
-                    lambda el: self.project(src, tgt, el), vec)
-
-        return self.connection_from_dds(src, tgt)(vec)
+        # Look up the connection once rather than once per component.
+        return _apply_to_dof_arrays(self.connection_from_dds(src, tgt), vec)
 
     def nodes(self, dd=None):
         r"""Return the nodes of a discretization.
@@ -185,7 +193,7 @@ class EagerDGDiscretization(DGDiscretizationWithBoundaries):
         """
         if len(args) == 1:
             vec, = args
-            dd = sym.DOFDesc("vol", sym.QTAG_NONE)
+            dd = sym.DD_VOLUME
         elif len(args) == 2:
             dd, vec = args
         else:
@@ -213,7 +221,7 @@ class EagerDGDiscretization(DGDiscretizationWithBoundaries):
         """
         if len(args) == 2:
             xyz_axis, vec = args
-            dd = sym.DOFDesc("vol", sym.QTAG_NONE)
+            dd = sym.DD_VOLUME
         elif len(args) == 3:
             dd, xyz_axis, vec = args
         else:
@@ -237,7 +245,7 @@ class EagerDGDiscretization(DGDiscretizationWithBoundaries):
         """
         if len(args) == 1:
             vecs, = args
-            dd = sym.DOFDesc("vol", sym.QTAG_NONE)
+            dd = sym.DD_VOLUME
         elif len(args) == 2:
             dd, vecs = args
         else:
@@ -265,13 +273,8 @@ class EagerDGDiscretization(DGDiscretizationWithBoundaries):
                 local_only=True)
 
     def inverse_mass(self, vec):
-        if (isinstance(vec, np.ndarray)
-                and vec.dtype.char == "O"
-                and not isinstance(vec, DOFArray)):
-            return obj_array_vectorize(
-                    lambda el: self.inverse_mass(el), vec)
-
-        return self._bound_inverse_mass()(u=vec)
+        bound_op = self._bound_inverse_mass()
+        return _apply_to_dof_arrays(lambda el: bound_op(u=el), vec)
 
     @memoize_method
     def _bound_face_mass(self, dd):
@@ -287,13 +290,8 @@ class EagerDGDiscretization(DGDiscretizationWithBoundaries):
         else:
             raise TypeError("invalid number of arguments")
 
-        if (isinstance(vec, np.ndarray)
-                and vec.dtype.char == "O"
-                and not isinstance(vec, DOFArray)):
-            return obj_array_vectorize(
-                    lambda el: self.face_mass(dd, el), vec)
-
-        return self._bound_face_mass(dd)(u=vec)
+        bound_op = self._bound_face_mass(dd)
+        return _apply_to_dof_arrays(lambda el: bound_op(u=el), vec)
 
     @memoize_method
     def _norm(self, p, dd):
@@ -344,13 +342,7 @@ class EagerDGDiscretization(DGDiscretizationWithBoundaries):
 
 def interior_trace_pair(discrwb, vec):
     i = discrwb.project("vol", "int_faces", vec)
-
-    if (isinstance(vec, np.ndarray)
-            and vec.dtype.char == "O"
-            and not isinstance(vec, DOFArray)):
-        e = obj_array_vectorize(
-                lambda el: discrwb.opposite_face_connection()(el),
-                i)
+    e = _apply_to_dof_arrays(discrwb.opposite_face_connection(), i)
 
     return TracePair("int_faces", interior=i, exterior=e)
 
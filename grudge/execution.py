@@ -105,7 +105,8 @@ class ExecutionMapper(mappers.Evaluator,
         return value
 
     def map_call(self, expr):
-        args = [self.rec(p) for p in expr.parameters]
+        rec = self.rec
+        args = [rec(p) for p in expr.parameters]
         return self.function_registry[expr.function.name](self.array_context, *args)
 
     # }}}
@@ -425,8 +426,9 @@ class ExecutionMapper(mappers.Evaluator,
         dof_array_kwargs = {}
         other_kwargs = {}
 
+        rec = self.rec
         for name, expr in kdescr.input_mappings.items():
-            v = self.rec(expr)
+            v = rec(expr)
             if isinstance(v, DOFArray):
                 dof_array_kwargs[name] = v
             else:
@@ -466,7 +468,8 @@ class ExecutionMapper(mappers.Evaluator,
         return list(result.items()), []
 
     def map_insn_assign(self, insn, profile_data=None):
-        return [(name, self.rec(expr))
+        rec = self.rec
+        return [(name, rec(expr))
                 for name, expr in zip(insn.names, insn.exprs)], []
 
     def map_insn_assign_to_discr_scoped(self, insn, profile_data=None):
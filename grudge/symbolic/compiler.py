@@ -69,6 +69,11 @@ def _make_dep_mapper(include_subscripts):
             include_calls="descend_args")
 
 
+@memoize
+def _make_var_dep_mapper():
+    return mappers.DependencyMapper(composite_leaves=False)
+
+
 # {{{ loopy kernel instruction
 
 class LoopyKernelDescriptor:
@@ -399,35 +404,42 @@ class Code:
 
         # {{{ topological sort
 
-        added_insns = set()
-        ordered_insns = []
-
-        def insert_insn(insn):
-            if insn in added_insns:
-                return
-
+        def get_writers(insn):
             for dep in insn.get_dependencies():
-                try:
-                    if isinstance(dep, Subscript):
-                        dep_name = dep.aggregate.name
-                    else:
-                        dep_name = dep.name
-
-                    writer = var_to_writer[dep_name]
-                except KeyError:
-                    # input variables won't be found
-                    pass
+                if isinstance(dep, Subscript):
+                    dep_name = dep.aggregate.name
                 else:
-                    insert_insn(writer)
+                    dep_name = dep.name
 
-            ordered_insns.append(insn)
-            added_insns.add(insn)
+                # input variables won't be found
+                writer = var_to_writer.get(dep_name)
+                if writer is not None:
+                    yield writer
 
-        for insn in self.instructions:
-            insert_insn(insn)
+        # This is a depth-first post-order walk. It keeps an explicit stack
+        # so that long dependency chains do not hit the recursion limit.
+        seen_insns = set()
+        ordered_insns = []
+
+        for root_insn in self.instructions:
+            if root_insn in seen_insns:
+                continue
+
+            seen_insns.add(root_insn)
+            stack = [(root_insn, get_writers(root_insn))]
+            while stack:
+                insn, writers = stack[-1]
+                for writer in writers:
+                    if writer not in seen_insns:
+                        seen_insns.add(writer)
+                        stack.append((writer, get_writers(writer)))
+                        break
+                else:
+                    stack.pop()
+                    ordered_insns.append(insn)
 
         assert len(ordered_insns) == len(self.instructions)
-        assert len(added_insns) == len(self.instructions)
+        assert len(seen_insns) == len(self.instructions)
 
         # }}}
 
@@ -444,28 +456,15 @@ class Code:
         pass
 
     @memoize_method
-    def get_next_step(self, available_names, done_insns):
-        from pytools import all, argmax2
-        available_insns = [
-                (insn, insn.priority) for insn in self.instructions
-                if insn not in done_insns
-                and all(dep.name in available_names
-                    for dep in insn.get_dependencies())]
-
-        if not available_insns:
-            raise self.NoInstructionAvailable
-
-        from pytools import flatten
-        discardable_vars = set(available_names) - set(flatten(
-            [dep.name for dep in insn.get_dependencies()]
-            for insn in self.instructions
-            if insn not in done_insns))
-
-        # {{{ make sure results do not get discarded
-
-        dm = mappers.DependencyMapper(composite_leaves=False)
+    def _get_result_var_names(self):
+        if isinstance(self.result, np.ndarray) and self.result.dtype.char == "O":
+            result_exprs = self.result.flat
+        else:
+            result_exprs = [self.result]
 
-        def remove_result_variable(result_expr):
+        dm = _make_var_dep_mapper()
+        result_var_names = set()
+        for result_expr in result_exprs:
             # The extra dependency mapper run is necessary
             # because, for instance, subscripts can make it
             # into the result expression, which then does
@@ -473,11 +472,35 @@ class Code:
 
             for var in dm(result_expr):
                 assert isinstance(var, Variable)
-                discardable_vars.discard(var.name)
+                result_var_names.add(var.name)
 
-        obj_array_vectorize(remove_result_variable, self.result)
+        return frozenset(result_var_names)
 
-        # }}}
+    @memoize_method
+    def get_next_step(self, available_names, done_insns):
+        from pytools import argmax2
+
+        # Find the ready instructions and the names still needed by
+        # pending instructions in a single pass over the instructions.
+        available_insns = []
+        needed_names = set()
+        for insn in self.instructions:
+            if insn in done_insns:
+                continue
+
+            dep_names = [dep.name for dep in insn.get_dependencies()]
+            needed_names.update(dep_names)
+
+            if all(name in available_names for name in dep_names):
+                available_insns.append((insn, insn.priority))
+
+        if not available_insns:
+            raise self.NoInstructionAvailable
+
+        # make sure results do not get discarded
+        discardable_vars = (
+                set(available_names) - needed_names
+                - self._get_result_var_names())
 
         return argmax2(available_insns), discardable_vars
 
@@ -507,7 +530,7 @@ class Code:
                             log_quantities["insn_eval_timer"].start_sub_timer()
 
                 insn, discardable_vars = self.get_next_step(
-                    frozenset(list(context.keys())),
+                    frozenset(context),
                     frozenset(done_insns))
 
                 done_insns.add(insn)
@@ -607,10 +630,9 @@ def aggregate_assignments(inf_mapper, instructions, result,
     # {{{ aggregation helpers
 
     def get_complete_origins_set(insn, skip_levels=0):
-        try:
-            return insn_to_origins_cache[insn]
-        except KeyError:
-            pass
+        result = insn_to_origins_cache.get(insn)
+        if result is not None:
+            return result
 
         if skip_levels < 0:
             skip_levels = 0
@@ -632,12 +654,12 @@ def aggregate_assignments(inf_mapper, instructions, result,
     var_assignees_cache = {}
 
     def get_var_assignees(insn):
-        try:
-            return var_assignees_cache[insn]
-        except KeyError:
+        result = var_assignees_cache.get(insn)
+        if result is None:
             result = {Variable(assignee) for assignee in insn.get_assignees()}
             var_assignees_cache[insn] = result
-            return result
+
+        return result
 
     def aggregate_two_assignments(ass_1, ass_2):
         names = ass_1.names + ass_2.names
@@ -702,13 +724,17 @@ def aggregate_assignments(inf_mapper, instructions, result,
 
         agg_candidates = []
         for i, other_assign in enumerate(unprocessed_assigns):
+            if my_assign.priority != other_assign.priority:
+                continue
+
             other_deps = other_assign.get_dependencies()
             other_assignees = get_var_assignees(other_assign)
 
-            if ((my_deps & other_deps
-                    or my_deps & other_assignees
-                    or other_deps & my_assignees)
-                    and my_assign.priority == other_assign.priority):
+            # isdisjoint stops at the first shared element and does not
+            # build the intersection.
+            if not (my_deps.isdisjoint(other_deps)
+                    and my_deps.isdisjoint(other_assignees)
+                    and other_deps.isdisjoint(my_assignees)):
                 agg_candidates.append((i, other_assign))
 
         did_work = False
@@ -774,34 +800,48 @@ def aggregate_assignments(inf_mapper, instructions, result,
                         isinstance(dep, Variable)} & my_assignees)
                 for name, expr in names_exprs]
 
+        # Schedule level by level: each level consists of the assignments
+        # whose dependencies are all satisfied by earlier levels. Instead of
+        # rescanning the remaining assignments for every level, keep a count
+        # of unsatisfied dependencies and release dependents as their
+        # dependencies become available.
+        name_to_dependents = {}
+        unsatisfied_counts = []
+        level = []
+        for i, (name, expr, deps) in enumerate(names_exprs_deps):
+            unsatisfied_counts.append(len(deps))
+            for dep in deps:
+                name_to_dependents.setdefault(dep, []).append(i)
+            if not deps:
+                level.append(i)
+
         ordered_names_exprs = []
         available_names = set()
 
-        while names_exprs_deps:
+        while level:
             schedulable = []
-
-            i = 0
-            while i < len(names_exprs_deps):
-                name, expr, deps = names_exprs_deps[i]
-
-                unsatisfied_deps = deps - available_names
-
-                if not unsatisfied_deps:
-                    schedulable.append((str(expr), name, expr))
-                    del names_exprs_deps[i]
-                else:
-                    i += 1
+            for i in level:
+                name, expr, _ = names_exprs_deps[i]
+                schedulable.append((str(expr), name, expr, i))
 
             # make sure these come out in a constant order
             schedulable.sort()
 
-            if schedulable:
-                for key, name, expr in schedulable:
-                    ordered_names_exprs.append((name, expr))
-                    available_names.add(name)
-            else:
-                raise RuntimeError("aggregation resulted in an "
-                        "impossible assignment")
+            level = []
+            for key, name, expr, i in schedulable:
+                ordered_names_exprs.append((name, expr))
+                if name in available_names:
+                    continue
+                available_names.add(name)
+
+                for dependent in name_to_dependents.get(name, ()):
+                    unsatisfied_counts[dependent] -= 1
+                    if not unsatisfied_counts[dependent]:
+                        level.append(dependent)
+
+        if len(ordered_names_exprs) < len(names_exprs_deps):
+            raise RuntimeError("aggregation resulted in an "
+                    "impossible assignment")
 
         return Assign(
                 names=[name for name, expr in ordered_names_exprs],
@@ -844,6 +884,8 @@ class ToLoopyExpressionMapper(mappers.IdentityMapper):
         self.used_names = set()
         self.non_scalar_vars = []
 
+        self._expr_to_loopy_ref = {}
+
     def map_name(self, name):
         dot_idx = name.find(".")
         if dot_idx != -1:
@@ -852,29 +894,39 @@ class ToLoopyExpressionMapper(mappers.IdentityMapper):
             return name
 
     def map_variable_ref_expr(self, expr, name_prefix):
+        # The loopy expression for a given reference never changes, so naming
+        # and DOFDesc inference run only when it is first seen.
+        entry = self._expr_to_loopy_ref.get(expr)
+        if entry is None:
+            entry = self._map_new_variable_ref_expr(expr, name_prefix)
+            self._expr_to_loopy_ref[expr] = entry
+
+        result, is_non_scalar = entry
+        if is_non_scalar:
+            self.non_scalar_vars.append(self.expr_to_name[expr])
+
+        return result
+
+    def _map_new_variable_ref_expr(self, expr, name_prefix):
         from pymbolic import var
         dd = self.dd_inference_mapper(expr)
 
-        try:
-            name = self.expr_to_name[expr]
-        except KeyError:
-            name_prefix = self.map_name(name_prefix)
-            name = name_prefix
+        name_prefix = self.map_name(name_prefix)
+        name = name_prefix
 
-            suffix_nr = 0
-            while name in self.used_names:
-                name = f"{name_prefix}_{suffix_nr}"
-                suffix_nr += 1
-            self.used_names.add(name)
+        suffix_nr = 0
+        while name in self.used_names:
+            name = f"{name_prefix}_{suffix_nr}"
+            suffix_nr += 1
+        self.used_names.add(name)
 
-            self.expr_to_name[expr] = name
+        self.expr_to_name[expr] = name
 
         from grudge.symbolic.primitives import DTAG_SCALAR
         if dd.domain_tag == DTAG_SCALAR or name in self.temp_names:
-            return var(name)
+            return var(name), False
         else:
-            self.non_scalar_vars.append(name)
-            return var(name)[self.subscript]
+            return var(name)[self.subscript], True
 
     def map_variable(self, expr):
         return self.map_variable_ref_expr(expr, expr.name)
@@ -1054,8 +1106,7 @@ class ToLoopyInstructionMapper:
         input_mappings = {}
         output_mappings = {}
 
-        from grudge.symbolic.mappers import DependencyMapper
-        dep_mapper = DependencyMapper(composite_leaves=False)
+        dep_mapper = _make_var_dep_mapper()
 
         for expr, name in expr_mapper.expr_to_name.items():
             deps = dep_mapper(expr)
@@ -1155,9 +1206,6 @@ class OperatorCompiler(mappers.IdentityMapper):
         # Put the result expressions into variables as well.
         expr = sym.cse(expr, "_result")
 
-        # from grudge.symbolic.mappers.type_inference import TypeInferrer
-        # self.typedict = TypeInferrer()(expr)
-
         # Used for diff batching
         self.diff_ops = self.collect_diff_ops(expr)
 
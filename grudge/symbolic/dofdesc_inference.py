@@ -25,8 +25,15 @@ THE SOFTWARE.
 # opposite direction.
 
 
-from pymbolic.mapper import RecursiveMapper, CSECachingMapperMixin
-from grudge.symbolic.primitives import DOFDesc, DTAG_SCALAR
+import pymbolic.primitives as prim
+from pymbolic.mapper import RecursiveMapper
+from grudge.symbolic.primitives import DTAG_SCALAR, DD_SCALAR, HasDOFDesc
+from grudge.symbolic.mappers import IdCachingMapperMixin
+
+
+# Unification is pure, and only ever sees a handful of distinct DOF
+# descriptors. Failures are not cached, as their message depends on *expr*.
+_unified_dofdescs_cache = {}
 
 
 def unify_dofdescs(dd_a, dd_b, expr=None):
@@ -34,23 +41,35 @@ def unify_dofdescs(dd_a, dd_b, expr=None):
         assert dd_b is not None
         return dd_b
 
+    key = (dd_a, dd_b)
+    result = _unified_dofdescs_cache.get(key)
+    if result is None:
+        result = _unify_dofdescs_uncached(dd_a, dd_b, expr)
+        _unified_dofdescs_cache[key] = result
+
+    return result
+
+
+def _location_str(expr):
+    # Stringifying *expr* is expensive, so only do it for error messages.
     if expr is not None:
-        loc_str = "in expression %s" % str(expr)
+        return "in expression %s" % str(expr)
     else:
-        loc_str = ""
+        return ""
+
 
-    from grudge.symbolic.primitives import DTAG_SCALAR
+def _unify_dofdescs_uncached(dd_a, dd_b, expr):
     if dd_a.domain_tag != dd_b.domain_tag:
         if dd_a.domain_tag == DTAG_SCALAR:
             return dd_b
         elif dd_b.domain_tag == DTAG_SCALAR:
             return dd_a
         else:
-            raise ValueError("mismatched domain tags " + loc_str)
+            raise ValueError("mismatched domain tags " + _location_str(expr))
 
     # domain tags match
     if dd_a.quadrature_tag != dd_b.quadrature_tag:
-        raise ValueError("mismatched quadrature tags " + loc_str)
+        raise ValueError("mismatched quadrature tags " + _location_str(expr))
 
     return dd_a
 
@@ -73,7 +92,7 @@ class InferrableMultiAssignment:
     # (not a base class--only documents the interface)
 
 
-class DOFDescInferenceMapper(RecursiveMapper, CSECachingMapperMixin):
+class DOFDescInferenceMapper(IdCachingMapperMixin, RecursiveMapper):
     def __init__(self, assignments, function_registry,
                 name_to_dofdesc=None, check=True):
         """
@@ -90,32 +109,48 @@ class DOFDescInferenceMapper(RecursiveMapper, CSECachingMapperMixin):
                 if not a.neglect_for_dofdesc_inference
                 for name in a.get_assignees()}
 
+        # The hints passed in are only ever read, so they are not copied.
+        # Inferred DOFDescs go into a separate dict.
         if name_to_dofdesc is None:
             name_to_dofdesc = {}
-        else:
-            name_to_dofdesc = name_to_dofdesc.copy()
 
-        self.name_to_dofdesc = name_to_dofdesc
+        self._name_to_dofdesc_hints = name_to_dofdesc
+        self.name_to_dofdesc = {}
 
         self.function_registry = function_registry
 
+    def rec(self, expr):
+        # Leaves carrying their own DOFDesc (variables, ones, node
+        # coordinates) need neither dispatch nor caching.
+        if isinstance(expr, HasDOFDesc):
+            return expr.dd
+
+        return super().rec(expr)
+
     def infer_for_name(self, name):
         try:
             return self.name_to_dofdesc[name]
         except KeyError:
-            a = self.name_to_assignment[name]
+            pass
 
-            inf_method = getattr(self, a.mapper_method)
-            for r_name, r_dofdesc in inf_method(a):
-                assert r_name not in self.name_to_dofdesc
-                self.name_to_dofdesc[r_name] = r_dofdesc
+        dd = self._name_to_dofdesc_hints.get(name)
+        if dd is not None:
+            return dd
 
-            return self.name_to_dofdesc[name]
+        a = self.name_to_assignment[name]
+
+        inf_method = getattr(self, a.mapper_method)
+        for r_name, r_dofdesc in inf_method(a):
+            assert r_name not in self.name_to_dofdesc
+            assert r_name not in self._name_to_dofdesc_hints
+            self.name_to_dofdesc[r_name] = r_dofdesc
+
+        return self.name_to_dofdesc[name]
 
     # {{{ expression mappings
 
     def map_constant(self, expr):
-        return DOFDesc(DTAG_SCALAR)
+        return DD_SCALAR
 
     def map_grudge_variable(self, expr):
         return expr.dd
@@ -123,9 +158,23 @@ class DOFDescInferenceMapper(RecursiveMapper, CSECachingMapperMixin):
     def map_variable(self, expr):
         return self.infer_for_name(expr.name)
 
+    def map_common_subexpression(self, expr):
+        # A CSE has the DOFDesc of its child. Repeated occurrences are
+        # answered by the id-keyed cache.
+        return self.rec(expr.child)
+
     def map_subscript(self, expr):
         # FIXME: Subscript has same type as aggregate--a bit weird
-        return self.rec(expr.aggregate)
+        aggregate = expr.aggregate
+
+        # Subscripted aggregates are almost always variables, whose
+        # DOFDescs can be found without going through rec.
+        if isinstance(aggregate, HasDOFDesc):
+            return aggregate.dd
+        elif type(aggregate) is prim.Variable:
+            return self.infer_for_name(aggregate.name)
+        else:
+            return self.rec(aggregate)
 
     def map_multi_child(self, expr, children):
         dofdesc = None
@@ -158,7 +207,7 @@ class DOFDescInferenceMapper(RecursiveMapper, CSECachingMapperMixin):
         return self.map_multi_child(expr, [expr.left, expr.right])
 
     def map_nodal_sum(self, expr, enclosing_prec):
-        return DOFDesc(DTAG_SCALAR)
+        return DD_SCALAR
 
     map_nodal_max = map_nodal_sum
     map_nodal_min = map_nodal_sum
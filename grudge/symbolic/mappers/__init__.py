@@ -22,7 +22,6 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 THE SOFTWARE.
 """
 
-import numpy as np
 import pymbolic.primitives
 import pymbolic.mapper.stringifier
 import pymbolic.mapper.evaluator
@@ -227,6 +226,32 @@ class BoundOpMapperMixin:
         return getattr(self, expr.op.mapper_method)(
                 expr.op, expr.field, *args, **kwargs)
 
+
+class IdCachingMapperMixin:
+    """Caches the result of :meth:`rec` by the identity of the expression
+    being mapped, so that subexpressions shared among several parents
+    (whether or not they are wrapped in a common subexpression) are only
+    traversed once.
+
+    Like :class:`pymbolic.mapper.CSECachingMapperMixin`, this does not
+    support extra arguments in mapper dispatch.
+    """
+
+    def rec(self, expr):
+        try:
+            cache = self._id_to_rec_result
+        except AttributeError:
+            cache = self._id_to_rec_result = {}
+
+        # The cache holds on to *expr* so that its id() is not reused.
+        entry = cache.get(id(expr))
+        if entry is not None:
+            return entry[1]
+
+        result = super().rec(expr)
+        cache[id(expr)] = (expr, result)
+        return result
+
 # }}}
 
 
@@ -274,6 +299,16 @@ class DependencyMapper(
     map_node_coordinate_component = _map_leaf
 
 
+class DependencyDetector(DependencyMapper):
+    """Like :class:`DependencyMapper`, but only finds out *whether* an
+    expression has dependencies. The result is truthy if it does. Traversal
+    of sums and products stops at the first child with a dependency.
+    """
+
+    def combine(self, values):
+        return any(values)
+
+
 class FlopCounter(
         CombineMapperMixin,
         pymbolic.mapper.flop_counter.FlopCounter):
@@ -410,18 +445,29 @@ class DistributedMapper(CSECachingMapperMixin, IdentityMapper):
 
     def __init__(self, connected_parts):
         self.connected_parts = connected_parts
+        self._rank_geometry_changers = {}
+
+    def _get_rank_geometry_changer(self, i_remote_part):
+        # Reusing one changer per remote part lets substitutions of fields
+        # shared among several face projections hit its CSE cache.
+        mapper = self._rank_geometry_changers.get(i_remote_part)
+        if mapper is None:
+            mapper = RankGeometryChanger(i_remote_part)
+            self._rank_geometry_changers[i_remote_part] = mapper
+
+        return mapper
 
     def map_operator_binding(self, expr):
-        from meshmode.mesh import BTAG_PARTITION
-        from meshmode.discretization.connection import (FACE_RESTR_ALL,
-                                                        FACE_RESTR_INTERIOR)
-        if (isinstance(expr.op, op.ProjectionOperator)
-                and expr.op.dd_in.domain_tag is FACE_RESTR_INTERIOR
-                and expr.op.dd_out.domain_tag is FACE_RESTR_ALL):
+        # The domain tag checks come first: they are plain identity tests,
+        # and few bindings go to all faces.
+        if (expr.op.dd_out.domain_tag is sym.FACE_RESTR_ALL
+                and expr.op.dd_in.domain_tag is sym.FACE_RESTR_INTERIOR
+                and isinstance(expr.op, op.ProjectionOperator)):
             distributed_work = 0
             for i_remote_part in self.connected_parts:
-                mapped_field = RankGeometryChanger(i_remote_part)(expr.field)
-                btag_part = BTAG_PARTITION(i_remote_part)
+                mapped_field = self._get_rank_geometry_changer(
+                        i_remote_part)(expr.field)
+                btag_part = sym.BTAG_PARTITION(i_remote_part)
                 distributed_work += op.ProjectionOperator(dd_in=btag_part,
                                              dd_out=expr.op.dd_out)(mapped_field)
             return expr + distributed_work
@@ -478,103 +524,6 @@ class RankGeometryChanger(CSECachingMapperMixin, IdentityMapper):
 # }}}
 
 
-# {{{ operator specializer
-
-class OperatorSpecializer(CSECachingMapperMixin, IdentityMapper):
-    """Guided by a typedict obtained through type inference (i.e. by
-    :class:`grudge.symbolic.mappers.type_inference.TypeInferrrer`),
-    substitutes more specialized operators for generic ones.
-
-    For example, if type inference has determined that a differentiation
-    operator is applied to an argument on a quadrature grid, this
-    differentiation operator is then swapped out for a *quadrature*
-    differentiation operator.
-    """
-
-    def __init__(self, typedict):
-        """
-        :param typedict: generated by
-        :class:`grudge.symbolic.mappers.type_inference.TypeInferrer`.
-        """
-        self.typedict = typedict
-
-    map_common_subexpression_uncached = \
-            IdentityMapper.map_common_subexpression
-
-    def map_operator_binding(self, expr):
-        from grudge.symbolic.primitives import BoundaryPair
-
-        from grudge.symbolic.mappers.type_inference import (
-                type_info, QuadratureRepresentation)
-
-        # {{{ figure out field type
-        try:
-            field_type = self.typedict[expr.field]
-        except TypeError:
-            # numpy arrays are not hashable
-            # has_quad_operand remains unset
-
-            assert isinstance(expr.field, np.ndarray)
-        else:
-            try:
-                field_repr_tag = field_type.repr_tag
-            except AttributeError:
-                # boundary pairs are not assigned types
-                assert isinstance(expr.field, BoundaryPair)
-                has_quad_operand = False
-            else:
-                has_quad_operand = isinstance(field_repr_tag,
-                            QuadratureRepresentation)
-        # }}}
-
-        # Based on where this is run in the symbolic operator processing
-        # pipeline, we may encounter both reference and non-reference
-        # operators.
-
-        # {{{ elementwise operators
-
-        if isinstance(expr.op, op.MassOperator) and has_quad_operand:
-            return op.QuadratureMassOperator(
-                    field_repr_tag.quadrature_tag)(self.rec(expr.field))
-
-        elif isinstance(expr.op, op.RefMassOperator) and has_quad_operand:
-            return op.RefQuadratureMassOperator(
-                    field_repr_tag.quadrature_tag)(self.rec(expr.field))
-
-        elif (isinstance(expr.op, op.StiffnessTOperator) and has_quad_operand):
-            return op.QuadratureStiffnessTOperator(
-                    expr.op.xyz_axis, field_repr_tag.quadrature_tag)(
-                            self.rec(expr.field))
-
-        elif (isinstance(expr.op, op.RefStiffnessTOperator)
-                and has_quad_operand):
-            return op.RefQuadratureStiffnessTOperator(
-                    expr.op.xyz_axis, field_repr_tag.quadrature_tag)(
-                            self.rec(expr.field))
-
-        elif (isinstance(expr.op, op.QuadratureGridUpsampler)
-                and isinstance(field_type, type_info.BoundaryVectorBase)):
-            # potential shortcut:
-            # if (isinstance(expr.field, OperatorBinding)
-            #        and isinstance(expr.field.op, RestrictToBoundary)):
-            #    return QuadratureRestrictToBoundary(
-            #            expr.field.op.tag, expr.op.quadrature_tag)(
-            #                    self.rec(expr.field.field))
-
-            return op.QuadratureBoundaryGridUpsampler(
-                    expr.op.quadrature_tag, field_type.boundary_tag)(expr.field)
-        # }}}
-
-        elif isinstance(expr.op, op.RestrictToBoundary) and has_quad_operand:
-            raise TypeError("RestrictToBoundary cannot be applied to "
-                    "quadrature-based operands--use QuadUpsample(Boundarize(...))")
-
-        else:
-            return IdentityMapper.map_operator_binding(self, expr)
-
-# }}}
-
-
 # {{{ global-to-reference mapper
 
 class GlobalToReferenceMapper(CSECachingMapperMixin, IdentityMapper):
@@ -592,100 +541,169 @@ class GlobalToReferenceMapper(CSECachingMapperMixin, IdentityMapper):
         volume_discr = discrwb.discr_from_dd(sym.DD_VOLUME)
         self.use_wadg = not all(grp.is_affine for grp in volume_discr.groups)
 
+        self._op_field_ids_to_result = {}
+        self._dd_and_dim_to_jacobian = {}
+        self._op_type_to_rewriter = dict(self._op_class_to_rewriter)
+
     map_common_subexpression_uncached = \
             IdentityMapper.map_common_subexpression
 
-    def map_operator_binding(self, expr):
-        # Global-to-reference is run after operator specialization, so
-        # if we encounter non-quadrature operators here, we know they
-        # must be nodal.
+    def _rewrite_derivative(self, ref_class, xyz_axis, field, dd_in,
+            with_jacobian=True):
+        def imd(rst):
+            return sym.inverse_surface_metric_derivative(
+                    rst, xyz_axis,
+                    ambient_dim=self.ambient_dim, dim=self.dim,
+                    dd=dd_in)
+
+        rec_field = self.rec(field)
+        if with_jacobian:
+            rec_field = self._jacobian(dd_in, self.dim) * rec_field
+
+            return sum(
+                    ref_class(rst_axis, dd_in=dd_in)(rec_field * imd(rst_axis))
+                    for rst_axis in range(self.dim))
+        else:
+            return sum(
+                    ref_class(rst_axis, dd_in=dd_in)(rec_field) * imd(rst_axis)
+                    for rst_axis in range(self.dim))
+
+    def _jacobian(self, dd, dim=None):
+        # The same jacobian is needed by every operator on *dd* that gets
+        # rewritten; building it once also lets all of them share one
+        # expression object.
+        if dim is None:
+            if dd.is_volume():
+                dim = self.dim
+            else:
+                dim = self.dim - 1
+
+        key = (dd, dim)
+        result = self._dd_and_dim_to_jacobian.get(key)
+        if result is None:
+            result = sym.area_element(self.ambient_dim, dim, dd=dd)
+            self._dd_and_dim_to_jacobian[key] = result
+
+        return result
+
+    def _rewrite_mass(self, expr):
+        dd_in = expr.op.dd_in
+        return op.RefMassOperator(dd_in, expr.op.dd_out)(
+                self._jacobian(dd_in) * self.rec(expr.field))
 
+    def _rewrite_inverse_mass(self, expr):
         dd_in = expr.op.dd_in
         dd_out = expr.op.dd_out
 
-        if dd_in.is_volume():
-            dim = self.dim
+        jac_in = self._jacobian(dd_in)
+        if self.use_wadg:
+            # based on https://arxiv.org/pdf/1608.03836.pdf
+            return op.RefInverseMassOperator(dd_in, dd_out)(
+                op.RefMassOperator(dd_in, dd_out)(
+                    1.0/jac_in * op.RefInverseMassOperator(dd_in, dd_out)(
+                        self.rec(expr.field))
+                        )
+                )
         else:
-            dim = self.dim - 1
-
-        jac_in = sym.area_element(self.ambient_dim, dim, dd=dd_in)
-        jac_noquad = sym.area_element(self.ambient_dim, dim,
-                dd=dd_in.with_qtag(sym.QTAG_NONE))
-
-        def rewrite_derivative(ref_class, field,  dd_in, with_jacobian=True):
-            def imd(rst):
-                return sym.inverse_surface_metric_derivative(
-                        rst, expr.op.xyz_axis,
-                        ambient_dim=self.ambient_dim, dim=self.dim,
-                        dd=dd_in)
-
-            rec_field = self.rec(field)
-            if with_jacobian:
-                jac_tag = sym.area_element(self.ambient_dim, self.dim, dd=dd_in)
-                rec_field = jac_tag * rec_field
-
-                return sum(
-                        ref_class(rst_axis, dd_in=dd_in)(rec_field * imd(rst_axis))
-                        for rst_axis in range(self.dim))
-            else:
-                return sum(
-                        ref_class(rst_axis, dd_in=dd_in)(rec_field) * imd(rst_axis)
-                        for rst_axis in range(self.dim))
-
-        if isinstance(expr.op, op.MassOperator):
-            return op.RefMassOperator(dd_in, dd_out)(
-                    jac_in * self.rec(expr.field))
-
-        elif isinstance(expr.op, op.InverseMassOperator):
-            if self.use_wadg:
-                # based on https://arxiv.org/pdf/1608.03836.pdf
-                return op.RefInverseMassOperator(dd_in, dd_out)(
-                    op.RefMassOperator(dd_in, dd_out)(
-                        1.0/jac_in * op.RefInverseMassOperator(dd_in, dd_out)(
-                            self.rec(expr.field))
-                            )
-                    )
-            else:
-                return op.RefInverseMassOperator(dd_in, dd_out)(
-                        1/jac_in * self.rec(expr.field))
-
-        elif isinstance(expr.op, op.FaceMassOperator):
-            jac_in_surf = sym.area_element(
-                    self.ambient_dim, self.dim - 1, dd=dd_in)
-            return op.RefFaceMassOperator(dd_in, dd_out)(
-                    jac_in_surf * self.rec(expr.field))
-
-        elif isinstance(expr.op, op.StiffnessOperator):
-            return op.RefMassOperator(dd_in=dd_in, dd_out=dd_out)(
-                    jac_noquad
-                    * self.rec(
-                        op.DiffOperator(expr.op.xyz_axis)(expr.field)))
-
-        elif isinstance(expr.op, op.DiffOperator):
-            return rewrite_derivative(
-                    op.RefDiffOperator,
-                    expr.field, dd_in=dd_in, with_jacobian=False)
-
-        elif isinstance(expr.op, op.StiffnessTOperator):
-            return rewrite_derivative(
-                    op.RefStiffnessTOperator,
-                    expr.field, dd_in=dd_in)
-
-        elif isinstance(expr.op, op.MInvSTOperator):
-            return self.rec(
-                    op.InverseMassOperator()(
-                        op.StiffnessTOperator(expr.op.xyz_axis)(
-                            self.rec(expr.field))))
+            return op.RefInverseMassOperator(dd_in, dd_out)(
+                    1/jac_in * self.rec(expr.field))
 
-        else:
+    def _rewrite_face_mass(self, expr):
+        dd_in = expr.op.dd_in
+        jac_in_surf = self._jacobian(dd_in, self.dim - 1)
+        return op.RefFaceMassOperator(dd_in, expr.op.dd_out)(
+                jac_in_surf * self.rec(expr.field))
+
+    def _rewrite_stiffness(self, expr):
+        dd_in = expr.op.dd_in
+        return op.RefMassOperator(dd_in=dd_in, dd_out=expr.op.dd_out)(
+                self._jacobian(dd_in.with_qtag(sym.QTAG_NONE))
+                * self.rec(
+                    op.DiffOperator(expr.op.xyz_axis)(expr.field)))
+
+    def _rewrite_diff(self, expr):
+        return self._rewrite_derivative(
+                op.RefDiffOperator, expr.op.xyz_axis,
+                expr.field, dd_in=expr.op.dd_in, with_jacobian=False)
+
+    def _rewrite_stiffness_t(self, expr):
+        return self._rewrite_derivative(
+                op.RefStiffnessTOperator, expr.op.xyz_axis,
+                expr.field, dd_in=expr.op.dd_in)
+
+    def _rewrite_minv_st(self, expr):
+        return self.rec(
+                op.InverseMassOperator()(
+                    op.StiffnessTOperator(expr.op.xyz_axis)(
+                        self.rec(expr.field))))
+
+    # Maps each global operator class to the method that rewrites it in terms
+    # of reference operators. Quadrature is carried by the operators' dd_in,
+    # so the same rewrite covers nodal and quadrature inputs.
+    _op_class_to_rewriter = {
+            op.MassOperator: _rewrite_mass,
+            op.InverseMassOperator: _rewrite_inverse_mass,
+            op.FaceMassOperator: _rewrite_face_mass,
+            op.StiffnessOperator: _rewrite_stiffness,
+            op.DiffOperator: _rewrite_diff,
+            op.StiffnessTOperator: _rewrite_stiffness_t,
+            op.MInvSTOperator: _rewrite_minv_st,
+            }
+
+    def map_operator_binding(self, expr):
+        # Bindings of the same operator to the same field often show up in
+        # several places (e.g. in more than one equation of a system) without
+        # being wrapped in a common subexpression, so cache them here.
+        # The entry holds on to the operator and the field so that their
+        # id()s are not reused.
+        key = (id(expr.op), id(expr.field))
+        entry = self._op_field_ids_to_result.get(key)
+        if entry is not None:
+            return entry[2]
+
+        result = self._map_operator_binding_uncached(expr)
+        self._op_field_ids_to_result[key] = (expr.op, expr.field, result)
+        return result
+
+    def _get_rewriter(self, op_type):
+        try:
+            return self._op_type_to_rewriter[op_type]
+        except KeyError:
+            pass
+
+        # Subclasses use the rewriter of their nearest rewritten base class.
+        # The MRO walk runs once per operator type.
+        rewriter = None
+        for base in op_type.__mro__:
+            rewriter = self._op_class_to_rewriter.get(base)
+            if rewriter is not None:
+                break
+
+        self._op_type_to_rewriter[op_type] = rewriter
+        return rewriter
+
+    def _map_operator_binding_uncached(self, expr):
+        rewriter = self._get_rewriter(type(expr.op))
+        if rewriter is None:
+            # Nothing to rewrite, so don't bother building geometric factors.
             return IdentityMapper.map_operator_binding(self, expr)
 
+        return rewriter(self, expr)
+
 # }}}
 
 
 # {{{ stringification ---------------------------------------------------------
 
 class StringifyMapper(pymbolic.mapper.stringifier.StringifyMapper):
+    _domain_tag_to_str = {
+            None: "?",
+            sym.DTAG_VOLUME_ALL: "vol",
+            sym.DTAG_SCALAR: "scalar",
+            sym.FACE_RESTR_ALL: "all_faces",
+            sym.FACE_RESTR_INTERIOR: "int_faces",
+            }
+
     def _format_dd(self, dd):
         def fmt(s):
             if isinstance(s, type):
@@ -693,23 +711,12 @@ class StringifyMapper(pymbolic.mapper.stringifier.StringifyMapper):
             else:
                 return repr(s)
 
-        from meshmode.mesh import BTAG_PARTITION
-        from meshmode.discretization.connection import (
-                FACE_RESTR_ALL, FACE_RESTR_INTERIOR)
-        if dd.domain_tag is None:
-            result = "?"
-        elif dd.domain_tag is sym.DTAG_VOLUME_ALL:
-            result = "vol"
-        elif dd.domain_tag is sym.DTAG_SCALAR:
-            result = "scalar"
-        elif dd.domain_tag is FACE_RESTR_ALL:
-            result = "all_faces"
-        elif dd.domain_tag is FACE_RESTR_INTERIOR:
-            result = "int_faces"
-        elif isinstance(dd.domain_tag, BTAG_PARTITION):
-            result = "part%d_faces" % dd.domain_tag.part_nr
-        else:
-            result = fmt(dd.domain_tag)
+        result = self._domain_tag_to_str.get(dd.domain_tag)
+        if result is None:
+            if isinstance(dd.domain_tag, sym.BTAG_PARTITION):
+                result = "part%d_faces" % dd.domain_tag.part_nr
+            else:
+                result = fmt(dd.domain_tag)
 
         if dd.quadrature_tag is None:
             pass
@@ -946,10 +953,10 @@ class CommutativeConstantFoldingMapper(
     def __init__(self):
         pymbolic.mapper.constant_folder\
                 .CommutativeConstantFoldingMapper.__init__(self)
-        self.dep_mapper = DependencyMapper()
+        self.dep_detector = DependencyDetector()
 
     def is_constant(self, expr):
-        return not bool(self.dep_mapper(expr))
+        return not self.dep_detector(expr)
 
     def map_operator_binding(self, expr):
         field = self.rec(expr.field)
@@ -1242,13 +1249,14 @@ class CollectorMixin(OperatorReducerMixin, LocalOpReducerMixin, FluxOpReducerMix
 #    pass
 
 
-class BoundOperatorCollector(CSECachingMapperMixin, CollectorMixin, CombineMapper):
+class BoundOperatorCollector(IdCachingMapperMixin, CollectorMixin, CombineMapper):
+    # Common subexpressions are covered by the identity-keyed cache of
+    # IdCachingMapperMixin, which, unlike CSECachingMapperMixin, does not need
+    # to hash and compare the (potentially large) subexpression.
+
     def __init__(self, op_class):
         self.op_class = op_class
 
-    map_common_subexpression_uncached = \
-            CombineMapper.map_common_subexpression
-
     def map_operator_binding(self, expr):
         if isinstance(expr.op, self.op_class):
             result = OrderedSet([expr])
@@ -153,16 +153,21 @@ class ProjectionOperator(Operator):
     def __call__(self, expr):
         from pytools.obj_array import obj_array_vectorize
 
-        def project_one(subexpr):
-            from pymbolic.primitives import is_constant
-            if self.dd_in == self.dd_out:
+        # Whether the projection is a no-op does not depend on the
+        # component, so decide it once rather than for each component.
+        if self.dd_in == self.dd_out:
+            def project_one(subexpr):
                 # no-op projection, go away
                 return subexpr
-            elif is_constant(subexpr):
-                return subexpr
-            else:
-                from grudge.symbolic.primitives import OperatorBinding
-                return OperatorBinding(self, subexpr)
+        else:
+            from pymbolic.primitives import is_constant
+            from grudge.symbolic.primitives import OperatorBinding
+
+            def project_one(subexpr):
+                if is_constant(subexpr):
+                    return subexpr
+                else:
+                    return OperatorBinding(self, subexpr)
 
         return obj_array_vectorize(project_one, expr)
 
@@ -619,7 +624,7 @@ class FaceMassOperatorBase(ElementwiseLinearOperator):
             dd_in = prim.DOFDesc(prim.FACE_RESTR_ALL, None)
 
         if dd_out is None or dd_out == "vol":
-            dd_out = prim.DOFDesc("vol", prim.QTAG_NONE)
+            dd_out = prim.DD_VOLUME
 
         if dd_out.uses_quadrature():
             raise ValueError("face mass operator outputs are not on "
@@ -130,6 +130,8 @@ class DTAG_VOLUME_ALL:      # noqa: N801
 
 
 class DTAG_BOUNDARY:        # noqa: N801
+    __slots__ = ("tag",)
+
     def __init__(self, tag):
         self.tag = tag
 
@@ -142,6 +144,13 @@ class DTAG_BOUNDARY:        # noqa: N801
     def __hash__(self):
         return hash(type(self)) ^ hash(self.tag)
 
+    # needed to pickle a class with __slots__ under protocols 0 and 1
+    def __getstate__(self):
+        return (self.tag,)
+
+    def __setstate__(self, state):
+        self.tag, = state
+
     def __repr__(self):
         return "<{}({})>".format(type(self).__name__, repr(self.tag))
 
@@ -172,6 +181,8 @@ class DOFDesc:
     .. automethod:: __hash__
     """
 
+    __slots__ = ("domain_tag", "quadrature_tag", "_hash", "_repr")
+
     def __init__(self, domain_tag, quadrature_tag=None):
         """
         :arg domain_tag: One of the following:
@@ -256,7 +267,10 @@ class DOFDesc:
         return type(self)(domain_tag=dtag, quadrature_tag=self.quadrature_tag)
 
     def __eq__(self, other):
-        return (type(self) == type(other)
+        if self is other:
+            return True
+
+        return (type(self) is type(other)
                 and self.domain_tag == other.domain_tag
                 and self.quadrature_tag == other.quadrature_tag)
 
@@ -264,18 +278,37 @@ class DOFDesc:
         return not self.__eq__(other)
 
     def __hash__(self):
-        return hash((type(self), self.domain_tag, self.quadrature_tag))
+        try:
+            return self._hash
+        except AttributeError:
+            self._hash = hash(
+                    (type(self), self.domain_tag, self.quadrature_tag))
+            return self._hash
+
+    # The cached hash and repr are left out of the pickled state: string
+    # hashes differ between interpreter processes.
+    def __getstate__(self):
+        return (self.domain_tag, self.quadrature_tag)
+
+    def __setstate__(self, state):
+        self.domain_tag, self.quadrature_tag = state
 
     def __repr__(self):
+        try:
+            return self._repr
+        except AttributeError:
+            pass
+
         def fmt(s):
             if isinstance(s, type):
                 return s.__name__
             else:
                 return repr(s)
 
-        return "DOFDesc({}, {})".format(
+        self._repr = "DOFDesc({}, {})".format(
                 fmt(self.domain_tag),
                 fmt(self.quadrature_tag))
+        return self._repr
 
 
 DD_SCALAR = DOFDesc(DTAG_SCALAR, None)
@@ -344,6 +377,11 @@ class Variable(HasDOFDesc, ExpressionBase, VariableBase):
     def __getinitargs__(self):
         return (self.name, self.dd,)
 
+    def is_equal(self, other):
+        return (other.__class__ == self.__class__
+                and other.name == self.name
+                and other.dd == self.dd)
+
     mapper_method = "map_grudge_variable"
 
 
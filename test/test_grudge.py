@@ -20,6 +20,8 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 THE SOFTWARE.
 """
 
+import pickle
+
 import numpy as np
 import numpy.linalg as la
 
@@ -973,6 +975,85 @@ def test_op_collector_order_determinism():
 # }}}
 
 
+# {{{ eager trace pairs
+
+@pytest.mark.parametrize("field_type", ["scalar", "vector"])
+def test_interior_trace_pair(actx_factory, field_type):
+    actx = actx_factory()
+
+    dim = 2
+    from meshmode.mesh.generation import generate_regular_rect_mesh
+    mesh = generate_regular_rect_mesh(
+            a=(-0.5,)*dim, b=(0.5,)*dim,
+            n=(4,)*dim, order=1)
+
+    from grudge.eager import EagerDGDiscretization, interior_trace_pair
+    discr = EagerDGDiscretization(actx, mesh, order=3)
+
+    nodes = discr.nodes()
+    if field_type == "scalar":
+        vec = nodes[0]
+    else:
+        vec = nodes
+
+    tpair = interior_trace_pair(discr, vec)
+
+    if field_type == "scalar":
+        components = [(tpair.int, tpair.ext)]
+    else:
+        assert tpair.ext.shape == (dim,)
+        components = list(zip(tpair.int, tpair.ext))
+
+    # the nodes are continuous, so both traces agree on interior faces
+    from meshmode.dof_array import DOFArray
+    for int_comp, ext_comp in components:
+        assert isinstance(ext_comp, DOFArray)
+        assert flat_norm(int_comp - ext_comp, np.inf) < 1.0e-12
+
+# }}}
+
+
+# {{{ dof desc pickling
+
+@pytest.mark.parametrize("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+@pytest.mark.parametrize("dd", [
+    sym.DD_VOLUME,
+    sym.DOFDesc(sym.DTAG_VOLUME_ALL, "OVSMP"),
+    sym.DOFDesc(sym.BTAG_ALL),
+    sym.DOFDesc(sym.BTAG_PARTITION(1)),
+    ])
+def test_dofdesc_pickle(dd, protocol):
+    hash(dd)
+    repr(dd)
+
+    unpickled_dd = pickle.loads(pickle.dumps(dd, protocol))
+    assert unpickled_dd == dd
+    assert hash(unpickled_dd) == hash(dd)
+    assert repr(unpickled_dd) == repr(dd)
+
+# }}}
+
+
+# {{{ dof desc inference
+
+def test_dofdesc_inference_cse():
+    from grudge.symbolic.dofdesc_inference import DOFDescInferenceMapper
+    inf_mapper = DOFDescInferenceMapper([], {})
+
+    x = sym.var("x")
+    s = sym.ScalarVariable("s")
+
+    # plain CSEs take the DOFDesc of their child
+    assert inf_mapper(sym.cse(x)) == sym.DD_VOLUME
+    assert inf_mapper(sym.cse(2 * s)) == sym.DD_SCALAR
+
+    # scalar and volume operands, inside and around the CSE
+    assert inf_mapper(sym.cse(x + 1) * 2) == sym.DD_VOLUME
+    assert inf_mapper(s * sym.cse(s * x)) == sym.DD_VOLUME
+
+# }}}
+
+
 # {{{ bessel
 
 def test_bessel(actx_factory):